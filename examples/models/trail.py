@@ -1,63 +1,83 @@
-from math import atan2, cos, radians, sin, sqrt
-
 import numpy as np
-import scipy.ndimage as im
+from scipy.signal import medfilt
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
 
 from bokeh.document import Document
 from bokeh.embed import file_html
 from bokeh.models import (Column, ColumnDataSource, GMapOptions, GMapPlot,
-                          Grid, Label, Line, LinearAxis, PanTool, Patches,
-                          Plot, Range1d, ResetTool, WheelZoomTool)
+                          Grid, Label, Line, LinearAxis, LinearColorMapper,
+                          PanTool, Patches, Plot, Range1d, ResetTool,
+                          WheelZoomTool)
 from bokeh.resources import INLINE
 from bokeh.sampledata.mtb import obiszow_mtb_xcm
 from bokeh.util.browser import view
 
 
-def haversin(theta):
-    return sin(0.5 * theta) ** 2
+def distance(lat, lon):
+    """Haversine distance between consecutive (lat, lon) points, in km. """
+    R = 6371
 
+    lat = np.radians(lat)
+    lon = np.radians(lon)
 
-def distance(p1, p2):
-    """Distance between (lat1, lon1) and (lat2, lon2). """
-    R = 6371
+    dlat = np.diff(lat)
+    dlon = np.diff(lon)
 
-    lat1, lon1 = p1
-    lat2, lon2 = p2
+    a = np.sin(0.5 * dlat) ** 2 + np.cos(lat[:-1]) * np.cos(lat[1:]) * np.sin(0.5 * dlon) ** 2
+    return 2 * R * np.arcsin(np.sqrt(a))
 
-    phi1 = radians(lat1)
-    phi2 = radians(lat2)
-    delta_lat = radians(lat2 - lat1)
-    delta_lon = radians(lon2 - lon1)
 
-    a = haversin(delta_lat) + cos(phi1) * cos(phi2) * haversin(delta_lon)
-    return 2 * R * atan2(sqrt(a), sqrt(1 - a))
+try:
+    from numba import njit
 
+    @njit(fastmath=True, cache=True)
+    def cumulative_distance(lat, lon):
+        """Cumulative haversine distance along a (lat, lon) track, in km. """
+        R = 6371
+        deg2rad = np.pi / 180
 
-def prep_data(dataset):
-    df = dataset.copy()
+        out = np.empty(lat.size)
+        out[0] = 0
+        for i in range(1, lat.size):
+            lat0 = deg2rad * lat[i - 1]
+            lat1 = deg2rad * lat[i]
+            dlon = deg2rad * (lon[i] - lon[i - 1])
+            a = np.sin(0.5 * (lat1 - lat0)) ** 2 + np.cos(lat0) * np.cos(lat1) * np.sin(0.5 * dlon) ** 2
+            out[i] = out[i - 1] + 2 * R * np.arcsin(np.sqrt(a))
+        return out
+except ImportError:
+    def cumulative_distance(lat, lon):
+        """Cumulative haversine distance along a (lat, lon) track, in km. """
+        dist = distance(lat, lon)
+        out = np.empty(dist.size + 1, dtype=dist.dtype)
+        out[0] = 0
+        np.cumsum(dist, out=out[1:])
+        return out
 
-    latlon = list(zip(df.lat, df.lon))
-    dist = np.array([distance(latlon[i + 1], latlon[i]) for i in range(len(latlon[:-1]))])
 
-    df["dist"] = np.concatenate(([0], np.cumsum(dist)))
+def prep_data(dataset):
+    cum_dist = cumulative_distance(dataset.lat.values, dataset.lon.values)
+    dist = np.diff(cum_dist)
 
-    slope = np.abs(100 * np.diff(df.alt) / (1000 * dist))
-    slope[np.where(                 slope <  4) ] = 0 # "green"
-    slope[np.where((slope >=  4) & (slope <  6))] = 1 # "yellow"
-    slope[np.where((slope >=  6) & (slope < 10))] = 2 # "pink"
-    slope[np.where((slope >= 10) & (slope < 15))] = 3 # "orange"
-    slope[np.where( slope >= 15                )] = 4 # "red"
-    slope = im.median_filter(slope, 6)
+    # slope in % is abs(100 * dalt / (1000 * dist)), fused into in-place ops
+    slope = np.diff(dataset.alt.to_numpy(dtype=np.float64))
+    np.divide(slope, dist, out=slope)
+    np.multiply(slope, 0.1, out=slope)
+    np.abs(slope, out=slope)
+    slope = np.digitize(slope, [4.0, 6.0, 10.0, 15.0]).astype(np.uint8)
+    if cv2 is not None:
+        slope = cv2.medianBlur(slope.reshape(1, -1), 7)[0]
+    else:
+        slope = medfilt(slope, 7)
 
-    colors = np.empty_like(slope, dtype=object)
-    colors[np.where(slope == 0)] = "green"
-    colors[np.where(slope == 1)] = "yellow"
-    colors[np.where(slope == 2)] = "pink"
-    colors[np.where(slope == 3)] = "orange"
-    colors[np.where(slope == 4)] = "red"
-    df["colors"] = [*colors, None] # NOTE: add None just make pandas happy
+    # NOTE: pad with a -1 sentinel so the column matches the frame's length
+    color_cls = np.concatenate([slope.astype(np.int8), np.array([-1], dtype=np.int8)])
 
-    return df
+    return dataset.assign(dist=cum_dist, color_cls=color_cls)
 
 name = "Obiszów MTB XCM"
 
@@ -66,8 +86,10 @@ name = "Obiszów MTB XCM"
 API_KEY = "GOOGLE_API_KEY"
 
 def trail_map(data):
-    lon = (min(data.lon) + max(data.lon)) / 2
-    lat = (min(data.lat) + max(data.lat)) / 2
+    lon_arr = data.lon.to_numpy()
+    lat_arr = data.lat.to_numpy()
+    lon = (lon_arr.min() + lon_arr.max()) / 2
+    lat = (lat_arr.min() + lat_arr.max()) / 2
 
     map_options = GMapOptions(lng=lon, lat=lat, zoom=13)
     plot = GMapPlot(width=800, height=800, map_options=map_options, api_key=API_KEY)
@@ -104,15 +126,23 @@ def altitude_profile(data):
 
     plot.add_tools(PanTool(), WheelZoomTool(), ResetTool())
 
-    X, Y = data.dist, data.alt
-    y0 = min(Y)
+    X = data.dist.to_numpy()
+    Y = data.alt.to_numpy()
+    y0 = np.full(len(Y) - 1, Y.min())
+
+    # float32 is plenty for screen coordinates and halves the payload
+    xs = np.column_stack([X[:-1], X[1:], X[1:], X[:-1]]).astype(np.float32)
+    ys = np.column_stack([y0,     y0,    Y[1:], Y[:-1]]).astype(np.float32)
 
+    # NOTE: Patches expects one array per patch, not a 2-D array
     patches_source = ColumnDataSource(dict(
-        xs=[[X[i], X[i+1], X[i+1], X[i]] for i in range(len(X[:-1])) ],
-        ys=[[y0,   y0,     Y[i+1], Y[i]] for i in range(len(Y[:-1])) ],
-        color=data.colors[:-1],
+        xs=list(xs),
+        ys=list(ys),
+        color_cls=data.color_cls[:-1],
     ))
-    patches = Patches(xs="xs", ys="ys", fill_color="color", line_color="color")
+    color_mapper = LinearColorMapper(palette=["green", "yellow", "pink", "orange", "red"], low=0, high=4)
+    color = dict(field="color_cls", transform=color_mapper)
+    patches = Patches(xs="xs", ys="ys", fill_color=color, line_color=color)
     plot.add_glyph(patches_source, patches)
 
     line_source = ColumnDataSource(dict(x=data.dist, y=data.alt))
@@ -21,7 +21,7 @@ log = logging.getLogger(__name__)
 #-----------------------------------------------------------------------------
 
 # Standard library imports
-from typing import Any as any
+from typing import TYPE_CHECKING, Any as any
 
 # Bokeh imports
 from ..core.has_props import HasProps, abstract
@@ -40,6 +40,9 @@ from ..core.validation import error
 from ..core.validation.errors import INVALID_PROPERTY_VALUE, NOT_A_PROPERTY_OF
 from ..model import Model
 
+if TYPE_CHECKING:
+    from ..core.property.descriptors import PropertyDescriptor
+
 #-----------------------------------------------------------------------------
 # Globals and constants
 #-----------------------------------------------------------------------------
@@ -61,6 +64,8 @@ class Callback(Model):
 
     '''
 
+    __slots__ = ()
+
     # explicit __init__ to support Init signatures
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -71,6 +76,8 @@ class OpenURL(Callback):
 
     '''
 
+    __slots__ = ()
+
     # explicit __init__ to support Init signatures
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -97,6 +104,8 @@ class CustomJS(Callback):
 
     '''
 
+    __slots__ = ()
+
     # explicit __init__ to support Init signatures
     def __init__(self, *args, **kwargs) -> None:
         super().__init__(*args, **kwargs)
@@ -119,6 +128,8 @@ class CustomJS(Callback):
 class SetValue(Callback):
     """ Allows to update a property of an object. """
 
+    __slots__ = ()
+
     # explicit __init__ to support Init signatures
     def __init__(self, obj: Init[HasProps] = Intrinsic, attr: Init[str] = Intrinsic, value: Init[any] = Intrinsic, **kwargs) -> None:
         super().__init__(obj=obj, attr=attr, value=value, **kwargs)
@@ -135,18 +146,36 @@ class SetValue(Callback):
     The value to set.
     """)
 
+    _descriptor_cache: tuple[HasProps, str, PropertyDescriptor[any] | None] | None = None
+
+    def _descriptor(self) -> PropertyDescriptor[any] | None:
+        ''' Look up the property descriptor for ``attr`` on ``obj``, caching
+        the result for the current ``(obj, attr)`` pair, so that repeated
+        validation doesn't repeat the lookup.
+
+        '''
+        cache = self._descriptor_cache
+        if cache is not None:
+            obj, attr, descriptor = cache
+            if obj is self.obj and attr == self.attr:
+                return descriptor
+
+        descriptor = self.obj.lookup(self.attr, raises=False)
+        self._descriptor_cache = (self.obj, self.attr, descriptor)
+        return descriptor
+
     @error(NOT_A_PROPERTY_OF)
     def _check_if_an_attribute_is_a_property_of_a_model(self):
-        if self.obj.lookup(self.attr, raises=False):
+        if self._descriptor() is not None:
             return None
         else:
             return f"{self.attr} is not a property of {self.obj}"
 
     @error(INVALID_PROPERTY_VALUE)
     def _check_if_provided_a_valid_value(self):
-        descriptor = self.obj.lookup(self.attr)
+        descriptor = self._descriptor()
 
-        if descriptor.property.is_valid(self.value):
+        if descriptor is None or descriptor.property.is_valid(self.value):
             return None
         else:
             return f"{self.value!r} is not a valid value for {self.obj}.{self.attr}"